@@ -31,13 +31,18 @@ else:  # USE_GOVCLOUD and USE_EC2 both provide EC2 instances
 # Must be last to tag all resources
 from . import tags  # noqa: F401
 
-# Since we're outputting YAML, we can include comments
-print("# This Cloudformation stack template was generated by")
-print("# https://github.com/caktus/aws-web-stacks")
-print("# at %s" % datetime.datetime.now())
-print("# with parameters:")
-use_parms = sorted(parm for parm in os.environ.keys() if parm.startswith("USE_"))
-for parm in use_parms:
-    print("#\t%s = %s" % (parm, os.environ[parm]))
-print()
-print(template.template.to_yaml())
+if os.environ.get('OUTPUT_FORMAT') == 'json':
+    # Compact JSON is the smallest template body we can produce, for templates that
+    # approach CloudFormation's size limits. JSON has no comments, so skip the header.
+    print(template.template.to_json(indent=None, sort_keys=False, separators=(",", ":")))
+else:
+    # Since we're outputting YAML, we can include comments
+    print("# This Cloudformation stack template was generated by")
+    print("# https://github.com/caktus/aws-web-stacks")
+    print("# at %s" % datetime.datetime.now())
+    print("# with parameters:")
+    use_parms = sorted(parm for parm in os.environ.keys() if parm.startswith("USE_"))
+    for parm in use_parms:
+        print("#\t%s = %s" % (parm, os.environ[parm]))
+    print()
+    print(template.template.to_yaml())
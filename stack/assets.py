@@ -11,22 +11,14 @@ from troposphere import (
     NoValue,
     Output,
     Ref,
+    Select,
     Split,
     iam
 )
-from troposphere.certificatemanager import Certificate, DomainValidationOption
-from troposphere.cloudfront import (
-    DefaultCacheBehavior,
-    Distribution,
-    DistributionConfig,
-    ForwardedValues,
-    Origin,
-    S3OriginConfig,
-    ViewerCertificate
-)
 from troposphere.s3 import (
     Bucket,
     BucketEncryption,
+    BucketPolicy,
     CorsConfiguration,
     CorsRules,
     Private,
@@ -47,10 +39,12 @@ from .sftp import use_sftp_condition, use_sftp_with_kms_condition
 from .template import template
 from .utils import ParameterWithDefaults as Parameter
 
+USE_GOVCLOUD = os.environ.get('USE_GOVCLOUD') == 'on'
+
 assets_bucket_access_control = template.add_parameter(
     Parameter(
         "AssetsBucketAccessControl",
-        Default="PublicRead",
+        Default="Private",
         Description="Canned ACL for the public S3 bucket. Private is recommended; it "
                     "allows for objects to be make publicly readable, but prevents "
                     "listing of the bucket contents.",
@@ -65,36 +59,41 @@ assets_bucket_access_control = template.add_parameter(
     label="Assets Bucket ACL",
 )
 
+# CORS origins for the application's domain and any alternates
+allowed_origins = Split(";", Join("", [
+    "https://", domain_name,
+    If(
+        no_alt_domains,
+        # if we don't have any alternate domains, return an empty string
+        "",
+        # otherwise, return the ';https://' that will be needed by the first domain
+        ";https://",
+    ),
+    # then, add all the alternate domains, joined together with ';https://'
+    Join(";https://", domain_name_alternates),
+    # now that we have a string of origins separated by ';', Split() is used to make it into a list again
+]))
+
+common_cors_rules = CorsRules(
+    AllowedOrigins=allowed_origins,
+    AllowedMethods=[
+        "POST",
+        "PUT",
+        "HEAD",
+        "GET",
+    ],
+    AllowedHeaders=[
+        "*",
+    ],
+)
+
 common_bucket_conf = dict(
     VersioningConfiguration=VersioningConfiguration(
         Status="Enabled"
     ),
     DeletionPolicy="Retain",
     CorsConfiguration=CorsConfiguration(
-        CorsRules=[CorsRules(
-            AllowedOrigins=Split(";", Join("", [
-                "https://", domain_name,
-                If(
-                    no_alt_domains,
-                    # if we don't have any alternate domains, return an empty string
-                    "",
-                    # otherwise, return the ';https://' that will be needed by the first domain
-                    ";https://",
-                ),
-                # then, add all the alternate domains, joined together with ';https://'
-                Join(";https://", domain_name_alternates),
-                # now that we have a string of origins separated by ';', Split() is used to make it into a list again
-            ])),
-            AllowedMethods=[
-                "POST",
-                "PUT",
-                "HEAD",
-                "GET",
-            ],
-            AllowedHeaders=[
-                "*",
-            ],
-        )],
+        CorsRules=[common_cors_rules],
     ),
 )
 
@@ -211,43 +210,49 @@ template.add_output(
     )
 )
 
-assets_management_policy_statements = [
-    dict(
-        Effect="Allow",
-        Action=["s3:ListBucket"],
-        Resource=Join("", [arn_prefix, ":s3:::", Ref(assets_bucket)]),
-    ),
-    dict(
-        Effect="Allow",
-        Action=["s3:*"],
-        Resource=Join("", [arn_prefix, ":s3:::", Ref(assets_bucket), "/*"]),
-    ),
-    dict(
-        Effect="Allow",
-        Action=["s3:ListBucket"],
-        Resource=Join("", [arn_prefix, ":s3:::", Ref(private_assets_bucket)]),
-    ),
-    dict(
-        Effect="Allow",
-        Action=["s3:*"],
-        Resource=Join("", [arn_prefix, ":s3:::", Ref(private_assets_bucket), "/*"]),
-    ),
-]
 
-assets_management_policy_statements_including_sftp_bucket = (
-    assets_management_policy_statements
-    + [
+# bucket ARNs built so far, keyed by (bucket title, suffix)
+bucket_arns = {}
+
+
+def bucket_arn(bucket, suffix=""):
+    """
+    Return the ARN of the given bucket, with an optional suffix such as "/*".
+    Repeated calls for the same bucket and suffix return the same Join().
+    """
+    key = (bucket.title, suffix)
+    if key not in bucket_arns:
+        parts = [arn_prefix, ":s3:::", Ref(bucket)]
+        if suffix:
+            parts.append(suffix)
+        bucket_arns[key] = Join("", parts)
+    return bucket_arns[key]
+
+
+def bucket_management_statements(buckets):
+    """
+    Return policy statements granting full access to the given buckets and their contents.
+    """
+    return [
         dict(
             Effect="Allow",
             Action=["s3:ListBucket"],
-            Resource=Join("", [arn_prefix, ":s3:::", Ref(sftp_assets_bucket)]),
+            Resource=[bucket_arn(bucket) for bucket in buckets],
         ),
         dict(
             Effect="Allow",
             Action=["s3:*"],
-            Resource=Join("", [arn_prefix, ":s3:::", Ref(sftp_assets_bucket), "/*"]),
+            Resource=[bucket_arn(bucket, "/*") for bucket in buckets],
         ),
     ]
+
+
+assets_management_policy_statements = bucket_management_statements(
+    [assets_bucket, private_assets_bucket]
+)
+
+assets_management_policy_statements_including_sftp_bucket = bucket_management_statements(
+    [assets_bucket, private_assets_bucket, sftp_assets_bucket]
 )
 
 # central asset management policy for use in instance roles
@@ -263,11 +268,35 @@ assets_management_policy = iam.Policy(
 )
 
 
-if os.environ.get('USE_GOVCLOUD') != 'on':
+if not USE_GOVCLOUD:
+    # CloudFront is not supported in GovCloud, so only import it when it's needed
+    from troposphere.certificatemanager import (
+        Certificate,
+        DomainValidationOption
+    )
+    from troposphere.cloudfront import (
+        CacheCookiesConfig,
+        CacheHeadersConfig,
+        CachePolicy,
+        CachePolicyConfig,
+        CacheQueryStringsConfig,
+        DefaultCacheBehavior,
+        Distribution,
+        DistributionConfig,
+        Origin,
+        OriginAccessControl,
+        OriginAccessControlConfig,
+        ParametersInCacheKeyAndForwardedToOrigin,
+        S3OriginConfig,
+        ViewerCertificate
+    )
+
     assets_use_cloudfront = template.add_parameter(
         Parameter(
             "AssetsUseCloudFront",
-            Description="Whether or not to create a CloudFront distribution tied to the S3 assets bucket.",
+            Description="Whether or not to create a CloudFront distribution tied to the S3 assets bucket. "
+                        "The distribution reads from the bucket via an origin access control, "
+                        "regardless of the Assets Bucket ACL.",
             Type="String",
             AllowedValues=["true", "false"],
             Default="true",
@@ -292,6 +321,20 @@ if os.environ.get('USE_GOVCLOUD') != 'on':
     assets_custom_domain_condition = "AssetsCloudFrontDomainCondition"
     template.add_condition(assets_custom_domain_condition, Not(Equals(Ref(assets_cloudfront_domain), "")))
 
+    assets_cloudfront_price_class = template.add_parameter(
+        Parameter(
+            "AssetsCloudFrontPriceClass",
+            Description="The CloudFront price class, which determines the edge locations that serve your "
+                        "assets. PriceClass_100 is the cheapest and uses the fewest edge locations; "
+                        "PriceClass_200 adds more regions; PriceClass_All uses every edge location.",
+            Type="String",
+            AllowedValues=["PriceClass_100", "PriceClass_200", "PriceClass_All"],
+            Default="PriceClass_100",
+        ),
+        group="Static Media",
+        label="CloudFront Price Class",
+    )
+
     assets_certificate_arn = template.add_parameter(
         Parameter(
             "AssetsCloudFrontCertArn",
@@ -332,7 +375,62 @@ if os.environ.get('USE_GOVCLOUD') != 'on':
         )
     )
 
-    # Create a CloudFront CDN distribution
+    # Names for account-wide CloudFront resources. The UUID at the end of the stack ID keeps
+    # them unique per stack and fixed in length (43 characters), unlike the stack name,
+    # which could push them past CloudFront's name limits.
+    assets_cloudfront_resource_name = Join("-", ["assets", Select(2, Split("/", Ref("AWS::StackId")))])
+
+    # Values in the cache key are also forwarded to the origin, so no separate
+    # origin request policy is needed.
+    assets_cache_policy = template.add_resource(
+        CachePolicy(
+            'AssetsCachePolicy',
+            Condition=assets_use_cloudfront_condition,
+            CachePolicyConfig=CachePolicyConfig(
+                Name=assets_cloudfront_resource_name,
+                # same TTLs CloudFront applied with the legacy ForwardedValues settings
+                MinTTL=0,
+                DefaultTTL=86400,
+                MaxTTL=31536000,
+                ParametersInCacheKeyAndForwardedToOrigin=ParametersInCacheKeyAndForwardedToOrigin(
+                    CookiesConfig=CacheCookiesConfig(CookieBehavior="none"),
+                    # make sure headers needed by CORS policy above get through to S3
+                    # http://docs.aws.amazon.com/AmazonCloudFront/latest/DeveloperGuide/header-caching.html#header-caching-web-cors
+                    HeadersConfig=CacheHeadersConfig(
+                        HeaderBehavior="whitelist",
+                        Headers=[
+                            'Origin',
+                            'Access-Control-Request-Headers',
+                            'Access-Control-Request-Method',
+                        ],
+                    ),
+                    # Cache results *should* vary based on querystring (e.g., 'style.css?v=3')
+                    QueryStringsConfig=CacheQueryStringsConfig(QueryStringBehavior="all"),
+                    # normalize Accept-Encoding in the cache key so compressed objects are cached once
+                    EnableAcceptEncodingGzip=True,
+                    EnableAcceptEncodingBrotli=True,
+                ),
+            ),
+        )
+    )
+
+    # Let CloudFront sign its requests to the assets bucket with SigV4, so objects need
+    # not be publicly readable to be served through the CDN
+    assets_origin_access_control = template.add_resource(
+        OriginAccessControl(
+            'AssetsOriginAccessControl',
+            Condition=assets_use_cloudfront_condition,
+            OriginAccessControlConfig=OriginAccessControlConfig(
+                Name=assets_cloudfront_resource_name,
+                OriginAccessControlOriginType="s3",
+                SigningBehavior="always",
+                SigningProtocol="sigv4",
+            ),
+        )
+    )
+
+    # Create a CloudFront CDN distribution. A single distribution fronts the public assets
+    # bucket; the private assets bucket is deliberately not exposed through CloudFront.
     distribution = template.add_resource(
         Distribution(
             'AssetsDistribution',
@@ -358,31 +456,56 @@ if os.environ.get('USE_GOVCLOUD') != 'on':
                 ),
                 Origins=[Origin(
                     Id="Assets",
-                    DomainName=GetAtt(assets_bucket, "DomainName"),
+                    DomainName=GetAtt(assets_bucket, "RegionalDomainName"),
+                    OriginAccessControlId=Ref(assets_origin_access_control),
+                    # still required for S3 origins, but left empty in favor of the OAC above
                     S3OriginConfig=S3OriginConfig(
                         OriginAccessIdentity="",
                     ),
                 )],
                 DefaultCacheBehavior=DefaultCacheBehavior(
                     TargetOriginId="Assets",
-                    ForwardedValues=ForwardedValues(
-                        # Cache results *should* vary based on querystring (e.g., 'style.css?v=3')
-                        QueryString=True,
-                        # make sure headers needed by CORS policy above get through to S3
-                        # http://docs.aws.amazon.com/AmazonCloudFront/latest/DeveloperGuide/header-caching.html#header-caching-web-cors
-                        Headers=[
-                            'Origin',
-                            'Access-Control-Request-Headers',
-                            'Access-Control-Request-Method',
-                        ],
-                    ),
+                    CachePolicyId=Ref(assets_cache_policy),
+                    # let CloudFront gzip/brotli-compress responses at the edge
+                    Compress=True,
                     ViewerProtocolPolicy="allow-all",
                 ),
+                HttpVersion="http2and3",
+                IPV6Enabled=True,
+                PriceClass=Ref(assets_cloudfront_price_class),
                 Enabled=True
             ),
         )
     )
 
+    # Allow only our distribution to read objects through the origin access control
+    template.add_resource(
+        BucketPolicy(
+            'AssetsBucketPolicy',
+            Condition=assets_use_cloudfront_condition,
+            Bucket=Ref(assets_bucket),
+            PolicyDocument=dict(
+                Version="2012-10-17",
+                Statement=[
+                    dict(
+                        Effect="Allow",
+                        Principal=dict(Service=["cloudfront.amazonaws.com"]),
+                        Action=["s3:GetObject"],
+                        Resource=bucket_arn(assets_bucket, "/*"),
+                        Condition=dict(
+                            StringEquals={
+                                "AWS:SourceArn": Join("", [
+                                    arn_prefix, ":cloudfront::", Ref("AWS::AccountId"),
+                                    ":distribution/", Ref(distribution),
+                                ]),
+                            },
+                        ),
+                    ),
+                ],
+            ),
+        )
+    )
+
     # Output CloudFront url
     template.add_output(
         Output(
@@ -453,7 +576,7 @@ common_sftp_user_role_statements = [
     dict(
         Effect="Allow",
         Action=["s3:ListBucket", "s3:GetBucketLocation"],
-        Resource=Join("", [arn_prefix, ":s3:::", Ref(sftp_assets_bucket)]),
+        Resource=bucket_arn(sftp_assets_bucket),
     ),
     dict(
         Effect="Allow",
@@ -466,7 +589,7 @@ common_sftp_user_role_statements = [
             "s3:GetObjectACL",
             "s3:PutObjectACL",
         ],
-        Resource=Join("", [arn_prefix, ":s3:::", Ref(sftp_assets_bucket), "/*"]),
+        Resource=bucket_arn(sftp_assets_bucket, "/*"),
     ),
 ]
 
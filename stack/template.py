@@ -31,6 +31,15 @@ class InterfaceTemplate(Template):
             self.parameter_labels[parameter.title] = label
         return parameter
 
+    def add_condition(self, name, condition):
+        """
+        Raise an error rather than silently overwriting a condition that was
+        already added under the same name.
+        """
+        if name in self.conditions:
+            raise ValueError('duplicate condition "%s" detected' % name)
+        return super(InterfaceTemplate, self).add_condition(name, condition)
+
     def set_group_order(self, group_order):
         """
         Set an ordered list of all known, possible parameter groups in this stack.